@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+# Upstream errors worth retrying (google.api_core exception class names)
+TRANSIENT_ERRORS = {
+    "ServiceUnavailable",
+    "ResourceExhausted",
+    "TooManyRequests",
+    "DeadlineExceeded",
+    "InternalServerError",
+    "GatewayTimeout",
+}
+
+
+class AIOverloadedError(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class AITimeoutError(Exception):
+    """Raised when an upstream call exceeds the per-call timeout."""
+
+
+def is_transient(error: BaseException) -> bool:
+    return isinstance(error, (ConnectionError, TimeoutError)) or type(error).__name__ in TRANSIENT_ERRORS
+
+
+class AIClient:
+    """
+    Runs blocking model calls on a dedicated thread pool.
+
+    The event loop never waits on the network: each call is submitted to the
+    pool and awaited with a timeout. At most `max_concurrency` calls run at
+    once and at most `queue_limit` more may wait; beyond that requests fail
+    fast with AIOverloadedError. Transient upstream errors are retried with
+    full-jitter exponential backoff.
+    """
+
+    def __init__(self, max_concurrency: int = 4, queue_limit: int = 16, timeout: float = 30.0,
+                 max_retries: int = 2, backoff_base: float = 0.5, backoff_max: float = 8.0):
+        self.max_concurrency = max_concurrency
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.calls = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.errors = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="ai")
+
+    def _acquire(self):
+        with self._lock:
+            if self._pending >= self.max_concurrency + self.queue_limit:
+                self.rejected += 1
+                raise AIOverloadedError("AI request queue is full")
+            self._pending += 1
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._pending -= 1
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def _attempt(self, fn: Callable[..., Any], *args: Any) -> Any:
+        self._acquire()
+        # The slot is held until the worker thread finishes, even after a timeout
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise AITimeoutError(f"AI call timed out after {self.timeout}s")
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        self.calls += 1
+        attempt = 0
+        while True:
+            try:
+                return await self._attempt(fn, *args)
+            except (AIOverloadedError, AITimeoutError):
+                raise
+            except Exception as e:
+                if attempt >= self.max_retries or not is_transient(e):
+                    self.errors += 1
+                    raise
+                delay = self.backoff(attempt)
+                logger.warning(f"Transient AI error ({type(e).__name__}), retrying in {delay:.2f}s")
+                self.retries += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self._pending,
+            "max_concurrency": self.max_concurrency,
+            "queue_limit": self.queue_limit,
+            "calls": self.calls,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "errors": self.errors,
+        }
@@ -0,0 +1,145 @@
+import json
+import math
+import re
+from collections import defaultdict
+from typing import Dict, List, Set
+import numpy as np
+from deals_table import get_deals_table
+
+# Rough prompt-size estimate; good enough to keep well under model limits
+CHARS_PER_TOKEN = 4
+
+# Words too common in sales questions to say which reps are relevant
+STOPWORDS = {
+    "the", "and", "for", "with", "who", "what", "which", "how", "many", "much", "are", "is",
+    "has", "have", "does", "did", "was", "were", "top", "best", "most", "all", "any", "their",
+    "his", "her", "rep", "reps", "representative", "representatives", "sales", "deal", "deals",
+    "total", "value", "show", "list", "give", "from", "about", "than", "more", "less", "per",
+}
+
+INSTRUCTIONS = """
+        You are a sales analysis assistant. The data contains information about {total_reps} sales representatives
+        across various regions including {regions}.
+        Their roles include {roles}.
+
+        IMPORTANT: Do not use quotes when referring to status values like Closed Won, In Progress, or Closed Lost.
+        Simply write the status directly without any quotation marks.
+
+        Each sales representative has the following data structure:
+        - id: unique identifier
+        - name: representative's name
+        - role: position
+        - region: geographical area
+        - skills: list of professional skills
+        - deals: list of deals (client, value, status)
+        - clients: list of clients (name, industry, contact)
+
+        Aggregates over all representatives: {aggregates}
+
+        Representatives relevant to the question ({included} of {total_reps}, one JSON object per line):
+{reps}
+
+        Answer the question based on this context specifically and helpfully. Provide the answer in English.
+        Do NOT use quotation marks around status values in your response.
+        """
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def compact_json(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def words(text: str) -> List[str]:
+    return [w for w in re.findall(r"[a-z0-9]+", text.lower()) if len(w) >= 3 and w not in STOPWORDS]
+
+
+class ContextData:
+    """
+    Prompt material derived once per dataset snapshot.
+
+    Holds the compact aggregates, a keyword index over names, roles, regions,
+    skills and client names, and the compact JSON of reps as they are used.
+    """
+
+    def __init__(self, snapshot):
+        self.reps = snapshot.sales_reps
+        self.regions = sorted({rep.get("region") for rep in self.reps if rep.get("region")})
+        self.roles = sorted({rep.get("role") for rep in self.reps if rep.get("role")})
+
+        deals = get_deals_table(snapshot)
+        summary = deals.summary(top=5)
+        self.aggregates = compact_json({
+            "total_deals": summary["total_deals"],
+            "total_value": summary["total_value"],
+            "win_rate": summary["win_rate"],
+            "by_status": summary["by_status"],
+            "by_region": summary["by_region"],
+            "top_reps": summary["top_reps"],
+        })
+        # Fallback order when the question names nobody: highest total deal value first
+        self.rows_by_value = np.argsort(-deals.aggregates()["rep_value"], kind="stable").tolist()
+
+        self.keywords: Dict[str, Set[int]] = defaultdict(set)
+        for row, rep in enumerate(self.reps):
+            texts = [rep.get("name", ""), rep.get("role", ""), rep.get("region", "")]
+            texts += rep.get("skills") or []
+            texts += [client.get("name", "") for client in rep.get("clients") or []]
+            texts += [client.get("industry", "") for client in rep.get("clients") or []]
+            texts += [deal.get("client", "") for deal in rep.get("deals") or []]
+            for word in words(" ".join(str(t) for t in texts)):
+                self.keywords[word].add(row)
+
+        self._encoded: Dict[int, str] = {}
+
+    def encoded(self, row: int) -> str:
+        text = self._encoded.get(row)
+        if text is None:
+            text = self._encoded[row] = compact_json(self.reps[row])
+        return text
+
+    def relevant_rows(self, question: str) -> List[int]:
+        """Rows sharing keywords with the question, rarest keywords weighted highest."""
+        scores: Dict[int, float] = defaultdict(float)
+        total = len(self.reps)
+        for word in set(words(question)):
+            rows = self.keywords.get(word)
+            if not rows:
+                continue
+            weight = math.log(1 + total / len(rows))
+            for row in rows:
+                scores[row] += weight
+        return sorted(scores, key=lambda row: (-scores[row], row))
+
+
+def get_context_data(snapshot) -> ContextData:
+    return snapshot.derived("ai_context", ContextData)
+
+
+def build_context(snapshot, question: str, token_budget: int) -> str:
+    """
+    Prompt context within `token_budget`: the aggregates plus as many
+    relevant reps as fit, falling back to the top reps by deal value.
+    """
+    data = get_context_data(snapshot)
+    fields = {
+        "total_reps": len(data.reps),
+        "regions": ", ".join(data.regions),
+        "roles": ", ".join(data.roles),
+        "aggregates": data.aggregates,
+    }
+    budget = token_budget - estimate_tokens(INSTRUCTIONS.format(included=0, reps="", **fields))
+
+    rows = data.relevant_rows(question) or data.rows_by_value
+    lines: List[str] = []
+    for row in rows:
+        line = data.encoded(row)
+        cost = estimate_tokens(line)
+        if cost > budget:
+            break
+        lines.append(line)
+        budget -= cost
+
+    return INSTRUCTIONS.format(included=len(lines), reps="\n".join(lines), **fields)
@@ -0,0 +1,152 @@
+import hashlib
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Versions are unique across every store in the process so that caches keyed
+# on a snapshot version can never confuse two different datasets.
+_version_counter = itertools.count(1)
+
+
+def normalize_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Strip stray quotes from deal status values once, at load time."""
+    for rep in data.get("salesReps", []):
+        for deal in rep.get("deals", []):
+            status = deal.get("status")
+            if isinstance(status, str) and '"' in status:
+                deal["status"] = status.replace('"', '')
+    return data
+
+
+class Snapshot:
+    """
+    An immutable, fully parsed view of the dataset.
+
+    Structures derived from the data (search indexes, aggregates, ...) are
+    memoized per snapshot through `derived`, so they are rebuilt exactly once
+    whenever a new snapshot is swapped in.
+    """
+
+    def __init__(self, data: Dict[str, Any], fingerprint: str, loaded_at: Optional[float] = None):
+        self.version = next(_version_counter)
+        self.data = data
+        self.fingerprint = fingerprint
+        self.loaded_at = loaded_at if loaded_at is not None else time.time()
+        self._derived: Dict[str, Any] = {}
+        self._derived_lock = threading.RLock()
+
+    @property
+    def sales_reps(self):
+        return self.data.get("salesReps", [])
+
+    def derived(self, key: str, factory: Callable[["Snapshot"], Any]) -> Any:
+        value = self._derived.get(key)
+        if value is None:
+            with self._derived_lock:
+                value = self._derived.get(key)
+                if value is None:
+                    value = factory(self)
+                    self._derived[key] = value
+        return value
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> "Snapshot":
+        encoded = json.dumps(data, sort_keys=True, default=str).encode("utf-8")
+        return cls(normalize_data(data), hashlib.sha1(encoded).hexdigest())
+
+
+class DatasetStore:
+    """
+    Process-wide holder of the current dataset snapshot.
+
+    The file is parsed once and re-parsed only when its mtime or size changes.
+    Readers always get a complete snapshot: a new one is built off to the side
+    and swapped in with a single reference assignment.
+    """
+
+    def __init__(self, path, check_interval: float = 1.0):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self.reload_count = 0
+        self._snapshot: Optional[Snapshot] = None
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _stat(self) -> Tuple[int, int]:
+        st = os.stat(self.path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self) -> Snapshot:
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        data = normalize_data(json.loads(raw))
+        snapshot = Snapshot(data, hashlib.sha1(raw).hexdigest())
+        logger.info(f"Loaded dataset v{snapshot.version} from {self.path} ({len(snapshot.sales_reps)} reps)")
+        return snapshot
+
+    def _is_stale(self) -> bool:
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return False
+        self._last_check = now
+        try:
+            return self._stat() != self._stamp
+        except OSError:
+            # Keep serving the last good snapshot if the file vanishes mid-edit
+            return False
+
+    def get(self) -> Snapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and (self._stamp is None or not self._is_stale()):
+            return snapshot
+        return self.reload(force=snapshot is None)
+
+    def reload(self, force: bool = True) -> Snapshot:
+        with self._lock:
+            try:
+                stamp = self._stat()
+            except OSError:
+                if self._snapshot is not None and not force:
+                    return self._snapshot
+                raise
+            if not force and self._snapshot is not None and stamp == self._stamp:
+                return self._snapshot
+            snapshot = self._load()
+            self._snapshot = snapshot
+            self._stamp = stamp
+            self._last_check = time.monotonic()
+            self.reload_count += 1
+            return snapshot
+
+    def replace(self, data: Dict[str, Any]) -> Snapshot:
+        """Install an in-memory dataset (used by tests and tooling)."""
+        snapshot = Snapshot.from_data(data)
+        with self._lock:
+            self._snapshot = snapshot
+            self._stamp = None
+        return snapshot
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> "DatasetStore":
+        store = cls(path="<memory>")
+        store.replace(data)
+        return store
+
+    def info(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "path": str(self.path),
+            "version": snapshot.version if snapshot else None,
+            "fingerprint": snapshot.fingerprint if snapshot else None,
+            "loaded_at": snapshot.loaded_at if snapshot else None,
+            "total_reps": len(snapshot.sales_reps) if snapshot else 0,
+            "reload_count": self.reload_count,
+        }
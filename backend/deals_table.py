@@ -0,0 +1,142 @@
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+WON = "Closed Won"
+LOST = "Closed Lost"
+IN_PROGRESS = "In Progress"
+
+
+class Dictionary:
+    """Dictionary encoding: maps each distinct label to a dense integer code."""
+
+    def __init__(self, labels: Optional[List[str]] = None):
+        self.labels: List[str] = []
+        self.codes: Dict[str, int] = {}
+        for label in labels or []:
+            self.encode(label)
+
+    def encode(self, label: str) -> int:
+        code = self.codes.get(label)
+        if code is None:
+            code = len(self.labels)
+            self.labels.append(label)
+            self.codes[label] = code
+        return code
+
+    def __len__(self):
+        return len(self.labels)
+
+
+class DealsTable:
+    """
+    Columnar copy of every deal in the dataset.
+
+    One entry per deal in parallel NumPy arrays: the owning rep's row, the
+    deal value, and dictionary-encoded status and client. Regions are encoded
+    per rep, so grouping deals by region is a single gather.
+    """
+
+    def __init__(self, reps: List[Dict]):
+        self.statuses = Dictionary([WON, IN_PROGRESS, LOST])
+        self.clients = Dictionary()
+        self.regions = Dictionary()
+        self.rep_ids = [rep.get("id") for rep in reps]
+        self.rep_names = [rep.get("name", "") for rep in reps]
+        self.rep_region = np.fromiter(
+            (self.regions.encode(rep.get("region", "")) for rep in reps), dtype=np.int32, count=len(reps)
+        )
+
+        rep_index, value, status, client = [], [], [], []
+        for row, rep in enumerate(reps):
+            for deal in rep.get("deals") or []:
+                rep_index.append(row)
+                value.append(deal.get("value") or 0)
+                status.append(self.statuses.encode(deal.get("status", "")))
+                client.append(self.clients.encode(deal.get("client", "")))
+
+        self.rep_index = np.asarray(rep_index, dtype=np.int32)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.status = np.asarray(status, dtype=np.int8)
+        self.client = np.asarray(client, dtype=np.int32)
+        self._aggregates: Optional[Dict[str, np.ndarray]] = None
+
+    def __len__(self):
+        return len(self.value)
+
+    def aggregates(self) -> Dict[str, np.ndarray]:
+        """Group-by sums, computed once per table."""
+        if self._aggregates is None:
+            n_status, n_region, n_reps = len(self.statuses), len(self.regions), len(self.rep_ids)
+            won = self.status == self.statuses.codes[WON]
+            lost = self.status == self.statuses.codes[LOST]
+            deal_region = self.rep_region[self.rep_index]
+            self._aggregates = {
+                "status_count": np.bincount(self.status, minlength=n_status),
+                "status_value": np.bincount(self.status, weights=self.value, minlength=n_status),
+                "region_count": np.bincount(deal_region, minlength=n_region),
+                "region_value": np.bincount(deal_region, weights=self.value, minlength=n_region),
+                "region_won": np.bincount(deal_region[won], minlength=n_region),
+                "region_lost": np.bincount(deal_region[lost], minlength=n_region),
+                "region_won_value": np.bincount(deal_region[won], weights=self.value[won], minlength=n_region),
+                "rep_count": np.bincount(self.rep_index, minlength=n_reps),
+                "rep_value": np.bincount(self.rep_index, weights=self.value, minlength=n_reps),
+                "rep_won_value": np.bincount(self.rep_index[won], weights=self.value[won], minlength=n_reps),
+            }
+        return self._aggregates
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        agg = self.aggregates()
+        won_code, lost_code = self.statuses.codes[WON], self.statuses.codes[LOST]
+        total_deals = int(len(self.value))
+        total_value = float(agg["status_value"].sum())
+
+        # Top reps by total deal value without sorting every rep
+        rep_value = agg["rep_value"]
+        k = min(top, len(rep_value))
+        top_rows = np.argpartition(-rep_value, k - 1)[:k] if k else np.empty(0, dtype=np.int64)
+        top_rows = top_rows[np.argsort(-rep_value[top_rows], kind="stable")]
+
+        return {
+            "total_deals": total_deals,
+            "total_value": total_value,
+            "average_deal_size": total_value / total_deals if total_deals else 0.0,
+            "win_rate": win_rate(agg["status_count"][won_code], agg["status_count"][lost_code]),
+            "by_status": [
+                {
+                    "status": label,
+                    "deal_count": int(agg["status_count"][code]),
+                    "total_value": float(agg["status_value"][code]),
+                }
+                for code, label in enumerate(self.statuses.labels)
+            ],
+            "by_region": [
+                {
+                    "region": label,
+                    "deal_count": int(agg["region_count"][code]),
+                    "total_value": float(agg["region_value"][code]),
+                    "won_value": float(agg["region_won_value"][code]),
+                    "win_rate": win_rate(agg["region_won"][code], agg["region_lost"][code]),
+                }
+                for code, label in enumerate(self.regions.labels)
+            ],
+            "top_reps": [
+                {
+                    "id": self.rep_ids[row],
+                    "name": self.rep_names[row],
+                    "region": self.regions.labels[self.rep_region[row]],
+                    "deal_count": int(agg["rep_count"][row]),
+                    "total_value": float(agg["rep_value"][row]),
+                    "won_value": float(agg["rep_won_value"][row]),
+                }
+                for row in top_rows.tolist()
+            ],
+        }
+
+
+def win_rate(won: int, lost: int) -> Optional[float]:
+    closed = int(won) + int(lost)
+    return int(won) / closed if closed else None
+
+
+def get_deals_table(snapshot) -> DealsTable:
+    return snapshot.derived("deals_table", lambda s: DealsTable(s.sales_reps))
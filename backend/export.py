@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+from typing import Dict, Iterable, Iterator, List
+
+# Flush to the client once this many bytes are buffered
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+CSV_COLUMNS = ["id", "name", "role", "region", "skills", "deal_count", "deal_value", "clients"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def csv_row(rep: Dict) -> List:
+    deals = rep.get("deals") or []
+    return [
+        rep.get("id"),
+        rep.get("name", ""),
+        rep.get("role", ""),
+        rep.get("region", ""),
+        ";".join(rep.get("skills") or []),
+        len(deals),
+        sum(deal.get("value") or 0 for deal in deals),
+        ";".join(client.get("name", "") for client in rep.get("clients") or []),
+    ]
+
+
+def _chunked(lines: Iterable[str]) -> Iterator[bytes]:
+    # Group small lines into chunks; memory stays bounded by EXPORT_CHUNK_SIZE
+    buffer: List[str] = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_SIZE:
+            yield "".join(buffer).encode("utf-8")
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def iter_ndjson(reps: Iterable[Dict]) -> Iterator[bytes]:
+    return _chunked(json.dumps(rep, ensure_ascii=False) + "\n" for rep in reps)
+
+
+def iter_csv(reps: Iterable[Dict]) -> Iterator[bytes]:
+    def lines():
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(CSV_COLUMNS)
+        for rep in reps:
+            writer.writerow(csv_row(rep))
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+        yield out.getvalue()
+
+    return _chunked(lines())
+
+
+def iter_export(reps: Iterable[Dict], format: str) -> Iterator[bytes]:
+    return iter_csv(reps) if format == "csv" else iter_ndjson(reps)
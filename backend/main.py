@@ -1,5 +1,6 @@
 from fastapi import FastAPI, Request, Query, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from typing import List, Dict, Any, Optional
 import uvicorn
 import json
@@ -9,8 +10,18 @@ import os
 from dotenv import load_dotenv
 import logging
 from urllib.parse import unquote
+import base64
 from math import ceil
 from pathlib import Path
+from contextlib import asynccontextmanager
+from dataset import DatasetStore, Snapshot
+from search_index import SearchIndex, get_search_index
+from deals_table import get_deals_table
+from export import MEDIA_TYPES, iter_export
+from response_cache import CacheEntry, ResponseCache, etag_matches, make_etag
+from ai_cache import AnswerCache, answer_key
+from ai_client import AIClient, AIOverloadedError, AITimeoutError
+from ai_context import build_context
 
 # Load environment variables from backend/.env
 env_path = Path(__file__).resolve().parent / '.env'
@@ -20,11 +31,25 @@ load_dotenv(dotenv_path=env_path)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Dataset store: parsed once, re-parsed only when the file changes
+DATA_FILE = "../dummyData.json"
+dataset_store = DatasetStore(DATA_FILE)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Parse the dataset at startup so the first request doesn't pay for it
+    try:
+        dataset_store.get()
+    except Exception as e:
+        logger.error(f"Error preloading data: {e}")
+    yield
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Sales Dashboard API",
     description="API for serving sales data and AI-powered insights",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware for frontend integration
@@ -49,15 +74,41 @@ except Exception as e:
     logger.error(f"Failed to configure Gemini AI: {str(e)}")
     raise ValueError(f"Failed to configure Gemini AI: {str(e)}")
 
-# Load dummy data
-def load_data():
+# Cache of serialized /api/sales-reps responses
+response_cache = ResponseCache(
+    max_bytes=int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024)),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL", 300))
+)
+
+# Cache of AI answers keyed on the normalized question and the prompt context
+ai_cache = AnswerCache(
+    max_entries=int(os.getenv("AI_CACHE_MAX_ENTRIES", 256)),
+    ttl=float(os.getenv("AI_CACHE_TTL", 600))
+)
+
+# Model calls run on a bounded thread pool so they never block the event loop
+ai_client = AIClient(
+    max_concurrency=int(os.getenv("AI_MAX_CONCURRENCY", 4)),
+    queue_limit=int(os.getenv("AI_QUEUE_LIMIT", 16)),
+    timeout=float(os.getenv("AI_TIMEOUT", 30)),
+    max_retries=int(os.getenv("AI_MAX_RETRIES", 2))
+)
+
+# Approximate prompt size limit for the dataset context
+AI_CONTEXT_TOKEN_BUDGET = int(os.getenv("AI_CONTEXT_TOKEN_BUDGET", 8000))
+
+# Get the current dataset snapshot
+def get_snapshot() -> Snapshot:
     try:
-        with open("../dummyData.json", "r") as f:
-            return json.load(f)
+        return dataset_store.get()
     except Exception as e:
         logger.error(f"Error loading data: {e}")
         raise HTTPException(status_code=500, detail="Error loading data")
 
+# Load dummy data
+def load_data():
+    return get_snapshot().data
+
 # Pydantic model for AI request - making data field optional
 class AIRequest(BaseModel):
     question: str
@@ -66,22 +117,49 @@ class AIRequest(BaseModel):
 # Common pagination parameters
 def get_pagination_params(
     page: int = Query(1, ge=1, description="Page number"),
-    page_size: int = Query(10, ge=1, le=100, description="Number of items per page")
+    page_size: int = Query(10, ge=1, le=100, description="Number of items per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous response's next_cursor"),
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Number of items per page in cursor mode"),
+    include_total: bool = Query(False, description="Count all matching items in cursor mode")
 ):
-    return {"page": page, "page_size": page_size}
+    return {
+        "page": page,
+        "page_size": page_size,
+        "cursor": cursor,
+        "limit": limit,
+        "include_total": include_total
+    }
+
+# Cursors are opaque to clients: base64url-encoded JSON holding the last rep id
+def encode_cursor(rep_id: Any) -> str:
+    raw = json.dumps({"id": rep_id}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Any:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded))["id"]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 # Helper function to filter data based on search query
-def search_data(data: List[Dict], query: str) -> List[Dict]:
+def search_data(data: List[Dict], query: str, index: Optional[SearchIndex] = None) -> List[Dict]:
     if not query:
         return data
     
+    # Candidate rows come from the index when one is built over `data`
+    if index is not None and index.reps is data:
+        candidates = [data[row] for row in index.match_any(query)]
+    else:
+        candidates = data
+    
     query = query.lower()
     results = []
     
     # Use a set to track IDs of items already added to results
     added_ids = set()
     
-    for item in data:
+    for item in candidates:
         # Skip if this item is already in results
         if item.get("id") in added_ids:
             continue
@@ -102,6 +180,36 @@ def search_data(data: List[Dict], query: str) -> List[Dict]:
     
     return results
 
+# Row ids of the reps matching every provided filter, in file order
+def filter_rows(snapshot: Snapshot, **filters: Optional[str]):
+    if not any(filters.values()):
+        return range(len(snapshot.sales_reps))
+    return get_search_index(snapshot).match(**filters)
+
+# Keyset pagination: rows after the cursor's rep id, in id order
+def paginate_cursor(snapshot: Snapshot, cursor: Optional[str], limit: int,
+                    include_total: bool, **filters: Optional[str]) -> Dict:
+    after = decode_cursor(cursor) if cursor else None
+    index = get_search_index(snapshot)
+    sales_reps = snapshot.sales_reps
+    
+    # Fetch one extra row to learn whether another page exists
+    rows = index.match_after(after, limit + 1, **filters)
+    has_next = len(rows) > limit
+    page = [sales_reps[row] for row in rows[:limit]]
+    
+    meta = {
+        "limit": limit,
+        "cursor": cursor,
+        "next_cursor": encode_cursor(page[-1].get("id")) if has_next else None,
+        "has_next": has_next
+    }
+    if include_total:
+        matched = index.match_set(**filters)
+        meta["total_items"] = len(sales_reps) if matched is None else len(matched)
+    
+    return {"data": page, "meta": meta}
+
 # Apply pagination to data
 def paginate_data(data: List, page: int, page_size: int) -> Dict:
     total_items = len(data)
@@ -124,8 +232,54 @@ def paginate_data(data: List, page: int, page_size: int) -> Dict:
         }
     }
 
+# Normalize search filters: trimmed, lowercased, and None when blank
+def normalize_filters(**filters: Optional[str]) -> Dict[str, Optional[str]]:
+    normalized = {}
+    for field, value in filters.items():
+        value = value.strip().lower() if value else ""
+        normalized[field] = value or None
+    return normalized
+
+# Build one page of filtered sales reps
+def build_page(snapshot: Snapshot, filters: Dict[str, Optional[str]], pagination: Dict) -> Dict:
+    sales_reps = snapshot.sales_reps
+    
+    # Cursor mode skips the full filter and count
+    if pagination["cursor"] is not None or pagination["limit"] is not None:
+        return paginate_cursor(
+            snapshot,
+            pagination["cursor"],
+            pagination["limit"] or pagination["page_size"],
+            pagination["include_total"],
+            **filters
+        )
+    
+    # Apply search filters if provided, intersecting the index posting lists
+    if any(filters.values()):
+        rows = filter_rows(snapshot, **filters)
+        sales_reps = [sales_reps[row] for row in rows]
+        
+    # Apply pagination
+    return paginate_data(
+        sales_reps, 
+        pagination["page"], 
+        pagination["page_size"]
+    )
+
+# Serialize exactly like FastAPI's default JSONResponse
+def encode_json(content: Any) -> bytes:
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+# Serve a cached body, or 304 when the client already has it
+def cached_response(request: Request, entry: CacheEntry) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
 @app.get("/api/sales-reps", tags=["Data"])
 def get_data(
+    request: Request,
     name: Optional[str] = Query(None, description="Search by representative name"),
     role: Optional[str] = Query(None, description="Search by role"),
     region: Optional[str] = Query(None, description="Search by region"),
@@ -141,50 +295,117 @@ def get_data(
     - **skills**: Optional search term to filter by skills
     - **page**: Page number for pagination (starts at 1)
     - **page_size**: Number of items per page
+    - **cursor** / **limit**: Cursor pagination ordered by rep id; either one switches to cursor mode
+    - **include_total**: Also count all matching items in cursor mode
+    
+    Responses are cached per dataset version and normalized query, and carry
+    an ETag; a matching `If-None-Match` gets a 304.
     """
     try:
-        # Load data
-        data = load_data()
+        snapshot = get_snapshot()
+        filters = normalize_filters(name=name, role=role, region=region, skills=skills)
         
-        # Get sales reps data
-        sales_reps = data.get("salesReps", [])
+        # Cache key: dataset version plus the normalized query
+        query_key = (tuple(filters.items()), tuple(sorted(pagination.items())))
+        cache_key = (snapshot.version, query_key)
         
-        # Apply search filters if provided
-        if name or role or region or skills:
-            filtered_reps = []
-            for rep in sales_reps:
-                # Check each search criterion
-                name_match = True if not name else name.lower() in rep.get("name", "").lower()
-                role_match = True if not role else role.lower() in rep.get("role", "").lower()
-                region_match = True if not region else region.lower() in rep.get("region", "").lower()
-                
-                # Skills match
-                skills_match = True
-                if skills:
-                    skills_match = False
-                    for skill in rep.get("skills", []):
-                        if skills.lower() in skill.lower():
-                            skills_match = True
-                            break
-                
-                # Only include if all provided criteria match
-                if name_match and role_match and region_match and skills_match:
-                    filtered_reps.append(rep)
-            
-            sales_reps = filtered_reps
-            
-        # Apply pagination
-        result = paginate_data(
-            sales_reps, 
-            pagination["page"], 
-            pagination["page_size"]
-        )
+        entry = response_cache.get(cache_key)
+        if entry is None:
+            body = encode_json(build_page(snapshot, filters, pagination))
+            entry = response_cache.put(cache_key, body, make_etag(snapshot.fingerprint, query_key))
         
-        return result
+        return cached_response(request, entry)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing request: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/sales-reps/export", tags=["Data"])
+def export_data(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Export format: ndjson or csv"),
+    name: Optional[str] = Query(None, description="Search by representative name"),
+    role: Optional[str] = Query(None, description="Search by role"),
+    region: Optional[str] = Query(None, description="Search by region"),
+    skills: Optional[str] = Query(None, description="Search by skills")
+):
+    """
+    Streams every matching sales representative as NDJSON or CSV.
+    
+    - **format**: `ndjson` (one rep per line) or `csv` (one row per rep, nested data summarized)
+    - **name**, **role**, **region**, **skills**: Same filters as `/api/sales-reps`
+    
+    Reps are encoded one at a time while the response is being sent, so memory
+    use does not grow with the size of the result.
+    """
+    snapshot = get_snapshot()
+    sales_reps = snapshot.sales_reps
+    rows = filter_rows(snapshot, name=name, role=role, region=region, skills=skills)
+    reps = (sales_reps[row] for row in rows)
+    return StreamingResponse(
+        iter_export(reps, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=sales-reps.{format}"}
+    )
+
+@app.get("/api/stats/deals", tags=["Stats"])
+def deal_stats(
+    top: int = Query(10, ge=1, le=100, description="Number of top reps by deal value to return")
+):
+    """
+    Returns deal aggregates computed on the columnar deals table.
+    
+    - **top**: Number of top representatives by total deal value
+    
+    Includes totals by status and region, overall and per-region win rate
+    (closed won vs. closed lost) and the average deal size.
+    """
+    try:
+        return get_deals_table(get_snapshot()).summary(top=top)
+    except Exception as e:
+        logger.error(f"Error computing deal stats: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/dataset", tags=["Data"])
+def dataset_info():
+    """
+    Returns the version and load statistics of the dataset snapshot being served.
+    """
+    get_snapshot()
+    return dataset_store.info()
+
+@app.get("/api/cache/stats", tags=["Ops"])
+def cache_stats():
+    """
+    Returns hit/miss/eviction counters for the response caches.
+    """
+    return {"responses": response_cache.stats(), "ai": ai_cache.stats(), "ai_client": ai_client.stats()}
+
+class ModelUnavailableError(Exception):
+    pass
+
+# Choose available model
+def get_model():
+    model_name = "gemini-1.5-flash"  # Fast model
+    try:
+        model = genai.GenerativeModel(model_name)
+        logger.info(f"Using {model_name} model")
+    except Exception as model_error:
+        logger.error(f"Model {model_name} not available: {model_error}")
+        # If model not available, try alternative model
+        model_name = "gemini-1.5-pro"
+        try:
+            model = genai.GenerativeModel(model_name)
+            logger.info(f"Fallback to {model_name} model")
+        except Exception as fallback_error:
+            logger.error(f"Fallback model also failed: {fallback_error}")
+            raise ModelUnavailableError(str(fallback_error))
+    return model
+
+# Clean up the response to remove escaped quotes and newlines
+def clean_answer(text: str) -> str:
+    return text.replace('\\n', ' ').replace('\\"', '"').replace('"Closed Won"', 'Closed Won').replace('"In Progress"', 'In Progress').replace('"Closed Lost"', 'Closed Lost').strip()
+
 @app.post("/api/ai", tags=["AI"])
 async def ai_endpoint(request: AIRequest):
     """
@@ -195,87 +416,47 @@ async def ai_endpoint(request: AIRequest):
     - **data**: (Optional) The sales data to analyze - if not provided, will use dummyData.json
     """
     try:
-        # Use data from request if provided, otherwise load from file
+        # Use data from request if provided, otherwise use the loaded dataset
         if request.data is None:
-            logger.info("No data provided in request, loading from file")
-            data = load_data()
+            logger.info("No data provided in request, using the loaded dataset")
+            snapshot = get_snapshot()
         else:
-            data = request.data
-        
-        # Get sales reps data
-        sales_reps = data.get("salesReps", [])
+            snapshot = Snapshot.from_data(request.data)
         
-        if not sales_reps:
+        if not snapshot.sales_reps:
             logger.warning("No sales representatives data found")
             return {"answer": "Sales data is empty or not in the expected format."}
         
-        # Extract sample data for richer context
-        sample_rep = sales_reps[0] if sales_reps else {}
-        
-        # Create a summarized context from the data
-        total_reps = len(sales_reps)
-        regions = list(set(rep.get("region", "") for rep in sales_reps if rep.get("region")))
-        roles = list(set(rep.get("role", "") for rep in sales_reps if rep.get("role")))
-        
-        # Process the data to remove quotes from status values
-        for rep in sales_reps:
-            for deal in rep.get("deals", []):
-                if "status" in deal:
-                    # Remove quotes from status values
-                    deal["status"] = deal["status"].replace('"', '')
-        
-        # Prepare a system prompt with context that explicitly instructs not to use escaped quotes
-        context = f"""
-        You are a sales analysis assistant. The data contains information about {total_reps} sales representatives 
-        across various regions including {', '.join(regions)}. 
-        Their roles include {', '.join(roles)}.
+        # Aggregates plus the reps relevant to the question, within the token budget
+        context = build_context(snapshot, request.question, AI_CONTEXT_TOKEN_BUDGET)
         
-        IMPORTANT: Do not use quotes when referring to status values like Closed Won, In Progress, or Closed Lost.
-        Simply write the status directly without any quotation marks.
+        prompt = f"{context}\n\nQuestion: {request.question}"
         
-        Each sales representative has the following data structure:
-        - id: unique identifier
-        - name: representative's name
-        - role: position
-        - region: geographical area
-        - skills: list of professional skills
-        - deals: list of deals (client, value, status)
-        - clients: list of clients (name, industry, contact)
-        
-        Complete data: {json.dumps(data, indent=2)}
-        
-        Answer the question based on this context specifically and helpfully. Provide the answer in English.
-        Do NOT use quotation marks around status values in your response.
-        """
+        async def ask() -> str:
+            model = get_model()
+            
+            # Start chat session
+            chat = model.start_chat(history=[])
+            
+            # Send message to model on the AI thread pool
+            response = await ai_client.run(chat.send_message, prompt)
+            
+            return clean_answer(response.text)
         
-        # Choose available model
-        model_name = "gemini-1.5-flash"  # Fast model
+        # Identical questions over the same context share one answer and one upstream call
         try:
-            model = genai.GenerativeModel(model_name)
-            logger.info(f"Using {model_name} model")
-        except Exception as model_error:
-            logger.error(f"Model {model_name} not available: {model_error}")
-            # If model not available, try alternative model
-            model_name = "gemini-1.5-pro"
-            try:
-                model = genai.GenerativeModel(model_name)
-                logger.info(f"Fallback to {model_name} model")
-            except Exception as fallback_error:
-                logger.error(f"Fallback model also failed: {fallback_error}")
-                return {"answer": "Sorry, AI service is currently unavailable. Please try again later."}
-        
-        # Start chat session
-        chat = model.start_chat(history=[])
-        
-        # Send message to model
-        response = chat.send_message(
-            f"{context}\n\nQuestion: {request.question}"
-        )
-        
-        # Clean up the response to remove escaped quotes and newlines
-        clean_response = response.text.replace('\\n', ' ').replace('\\"', '"').replace('"Closed Won"', 'Closed Won').replace('"In Progress"', 'In Progress').replace('"Closed Lost"', 'Closed Lost').strip()
+            answer = await ai_cache.get_or_compute(answer_key(request.question, context), ask)
+        except ModelUnavailableError:
+            return {"answer": "Sorry, AI service is currently unavailable. Please try again later."}
+        except AIOverloadedError:
+            raise HTTPException(status_code=503, detail="AI service is busy. Please try again shortly.",
+                                headers={"Retry-After": "1"})
+        except AITimeoutError:
+            raise HTTPException(status_code=504, detail="AI service timed out. Please try again later.")
         
-        return {"answer": clean_response}
+        return {"answer": answer}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing AI request: {e}")
         # Kembalikan HTTP Exception 500 untuk error yang tidak tertangani
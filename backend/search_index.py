@@ -0,0 +1,158 @@
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Fields that support substring filtering
+SEARCH_FIELDS = ("name", "role", "region", "skills")
+
+NGRAM = 3
+
+
+def ngrams(text: str) -> Set[str]:
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def field_values(rep: Dict, field: str) -> List[str]:
+    """Lowercased values of a rep's field; skills yield one value per skill."""
+    if field == "skills":
+        return [str(skill).lower() for skill in rep.get("skills") or [] if skill is not None]
+    value = rep.get(field)
+    return [str(value).lower()] if value is not None else [""]
+
+
+def id_sort_key(rep_id: Any) -> Tuple:
+    """Total order over rep ids: numbers first (numerically), then strings."""
+    if isinstance(rep_id, (int, float)) and not isinstance(rep_id, bool):
+        return (0, rep_id)
+    return (1, str(rep_id))
+
+
+class FieldIndex:
+    """
+    Trigram index over the distinct lowercased values of one field.
+
+    A substring query first narrows the distinct values through the trigram
+    posting lists, verifies the survivors with a plain `in` check, and then
+    returns the union of the rows holding those values. Regions, roles and
+    skills have few distinct values, so most lookups never touch per-row data.
+    """
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.value_ids: Dict[str, int] = {}
+        self.value_rows: List[Set[int]] = []
+        self.postings: Dict[str, Set[int]] = defaultdict(set)
+
+    def add(self, row: int, values: Iterable[str]):
+        for value in values:
+            value_id = self.value_ids.get(value)
+            if value_id is None:
+                value_id = len(self.values)
+                self.values.append(value)
+                self.value_ids[value] = value_id
+                self.value_rows.append(set())
+                for gram in ngrams(value):
+                    self.postings[gram].add(value_id)
+            self.value_rows[value_id].add(row)
+
+    def matching_values(self, query: str) -> List[int]:
+        if len(query) < NGRAM:
+            candidates = range(len(self.values))
+        else:
+            grams = sorted((self.postings.get(g, set()) for g in ngrams(query)), key=len)
+            if not grams[0]:
+                return []
+            candidates = set(grams[0])
+            for posting in grams[1:]:
+                candidates &= posting
+                if not candidates:
+                    return []
+        return [v for v in candidates if query in self.values[v]]
+
+    def rows(self, query: str) -> Set[int]:
+        value_ids = self.matching_values(query)
+        if len(value_ids) == 1:
+            return self.value_rows[value_ids[0]]
+        result: Set[int] = set()
+        for value_id in value_ids:
+            result |= self.value_rows[value_id]
+        return result
+
+
+class SearchIndex:
+    """
+    Per-snapshot search index over sales reps.
+
+    Row ids are positions in the `reps` list, so sorting matched rows keeps
+    the original file order.
+    """
+
+    def __init__(self, reps: List[Dict]):
+        self.reps = reps
+        self.fields = {field: FieldIndex() for field in SEARCH_FIELDS}
+        self._id_order: Optional[Tuple[List[Tuple], List[int]]] = None
+        for row, rep in enumerate(reps):
+            for field, index in self.fields.items():
+                index.add(row, field_values(rep, field))
+
+    def __len__(self):
+        return len(self.reps)
+
+    def match_set(self, **filters: Optional[str]) -> Optional[Set[int]]:
+        """Set of rows matching every given filter, or None when nothing is filtered."""
+        queries = [(field, query.lower()) for field, query in filters.items() if query]
+        if not queries:
+            return None
+
+        row_sets = sorted((self.fields[field].rows(query) for field, query in queries), key=len)
+        matched = set(row_sets[0])
+        for rows in row_sets[1:]:
+            if not matched:
+                break
+            matched &= rows
+        return matched
+
+    def match(self, **filters: Optional[str]) -> List[int]:
+        """Rows matching every given filter (case-insensitive substring), in order."""
+        matched = self.match_set(**filters)
+        if matched is None:
+            return list(range(len(self.reps)))
+        return sorted(matched)
+
+    def id_order(self) -> Tuple[List[Tuple], List[int]]:
+        """Sorted id keys and the rows in that order, built on first use."""
+        if self._id_order is None:
+            keyed = sorted((id_sort_key(rep.get("id")), row) for row, rep in enumerate(self.reps))
+            self._id_order = ([key for key, _ in keyed], [row for _, row in keyed])
+        return self._id_order
+
+    def match_after(self, after: Any, limit: int, **filters: Optional[str]) -> List[int]:
+        """
+        Up to `limit` matching rows whose id sorts after `after`, in id order.
+
+        Scanning starts at the cursor position and stops at the limit, so a
+        deep page costs the same as the first one.
+        """
+        keys, order = self.id_order()
+        start = 0 if after is None else bisect_right(keys, id_sort_key(after))
+        matched = self.match_set(**filters)
+        rows: List[int] = []
+        for position in range(start, len(order)):
+            row = order[position]
+            if matched is None or row in matched:
+                rows.append(row)
+                if len(rows) >= limit:
+                    break
+        return rows
+
+    def match_any(self, query: str) -> List[int]:
+        """Rows where any search field contains the query, in order."""
+        query = query.lower()
+        matched: Set[int] = set()
+        for index in self.fields.values():
+            matched |= index.rows(query)
+        return sorted(matched)
+
+
+def get_search_index(snapshot) -> SearchIndex:
+    return snapshot.derived("search_index", lambda s: SearchIndex(s.sales_reps))
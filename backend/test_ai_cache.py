@@ -0,0 +1,79 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+import pytest
+from fastapi.testclient import TestClient
+from ai_cache import AnswerCache, answer_key, normalize_question
+from main import app
+from test_main import DUMMY_DATA, use_data
+
+client = TestClient(app)
+
+# Fake model whose chat returns a fixed answer and records the prompts
+def fake_model(answer="John Doe is the top rep."):
+    chat = MagicMock()
+    chat.send_message.return_value = MagicMock(text=answer)
+    model = MagicMock()
+    model.start_chat.return_value = chat
+    return model, chat
+
+def test_normalize_question():
+    assert normalize_question("  Who is the TOP rep?? ") == "who is the top rep"
+    assert answer_key("Top rep?", "ctx") == answer_key("top   rep", "ctx")
+    assert answer_key("Top rep?", "ctx") != answer_key("Top rep?", "other ctx")
+
+def test_single_flight_coalesces_concurrent_calls():
+    cache = AnswerCache()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["answer"] * 5
+    assert calls == 1
+    assert cache.misses == 1
+    assert cache.coalesced == 4
+
+def test_failures_are_not_cached():
+    cache = AnswerCache()
+
+    async def fail():
+        raise RuntimeError("upstream down")
+
+    async def succeed():
+        return "ok"
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get_or_compute("k", fail))
+    assert asyncio.run(cache.get_or_compute("k", succeed)) == "ok"
+
+def test_lru_eviction():
+    cache = AnswerCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.evictions == 1
+
+def test_ai_endpoint_uses_cache():
+    model, chat = fake_model()
+    with use_data(DUMMY_DATA), patch("main.get_model", return_value=model), \
+            patch("main.ai_cache", AnswerCache()):
+        first = client.post("/api/ai", json={"question": "Who is the top rep?"})
+        second = client.post("/api/ai", json={"question": "who is the top rep"})
+        assert first.json() == second.json()
+        assert chat.send_message.call_count == 1
+
+        client.post("/api/ai", json={"question": "Which region sells most?"})
+        assert chat.send_message.call_count == 2
+
+        stats = client.get("/api/cache/stats").json()["ai"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from ai_cache import AnswerCache
+from ai_client import AIClient, AIOverloadedError, AITimeoutError
+from main import app
+from test_main import DUMMY_DATA, use_data
+
+class ServiceUnavailable(Exception):
+    pass
+
+# Local stub model whose chat blocks like a real network round trip
+def sleeping_model(delay):
+    def send_message(prompt):
+        time.sleep(delay)
+        return MagicMock(text="Stub answer")
+    chat = MagicMock()
+    chat.send_message.side_effect = send_message
+    model = MagicMock()
+    model.start_chat.return_value = chat
+    return model
+
+def test_retries_transient_errors():
+    client = AIClient(backoff_base=0)
+    fn = MagicMock(side_effect=[ServiceUnavailable("busy"), "ok"])
+    assert asyncio.run(client.run(fn)) == "ok"
+    assert fn.call_count == 2
+    assert client.retries == 1
+
+def test_does_not_retry_other_errors():
+    client = AIClient(backoff_base=0)
+    fn = MagicMock(side_effect=ValueError("bad request"))
+    with pytest.raises(ValueError):
+        asyncio.run(client.run(fn))
+    assert fn.call_count == 1
+
+def test_timeout():
+    client = AIClient(timeout=0.05)
+    with pytest.raises(AITimeoutError):
+        asyncio.run(client.run(time.sleep, 0.3))
+
+def test_rejects_when_queue_is_full():
+    client = AIClient(max_concurrency=1, queue_limit=1)
+
+    async def run():
+        return await asyncio.gather(*(client.run(time.sleep, 0.1) for _ in range(3)),
+                                    return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert sum(isinstance(r, AIOverloadedError) for r in results) == 1
+    assert client.rejected == 1
+
+def test_ai_call_does_not_block_event_loop():
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            ai_task = asyncio.create_task(http.post("/api/ai", json={"question": "Top rep?"}))
+            await asyncio.sleep(0.05)
+            start = time.perf_counter()
+            reps = await http.get("/api/sales-reps")
+            reps_latency = time.perf_counter() - start
+            assert not ai_task.done()
+            ai = await ai_task
+            return reps, reps_latency, ai
+
+    with use_data(DUMMY_DATA), patch("main.get_model", return_value=sleeping_model(0.5)), \
+            patch("main.ai_cache", AnswerCache()):
+        reps, reps_latency, ai = asyncio.run(run())
+
+    assert reps.status_code == 200
+    assert reps_latency < 0.3
+    assert ai.json() == {"answer": "Stub answer"}
+
+def test_ai_endpoint_overloaded():
+    with use_data(DUMMY_DATA), patch("main.get_model", return_value=sleeping_model(0)), \
+            patch("main.ai_client", MagicMock(run=AsyncMock(side_effect=AIOverloadedError()))), \
+            patch("main.ai_cache", AnswerCache()):
+        response = TestClient(app).post("/api/ai", json={"question": "Top rep?"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
@@ -0,0 +1,48 @@
+from dataset import Snapshot
+from ai_context import build_context, estimate_tokens, get_context_data
+from test_main import DUMMY_DATA
+
+def many_reps(count):
+    return {
+        "salesReps": [
+            {
+                "id": i,
+                "name": f"Rep{i}",
+                "role": "Account Executive",
+                "region": "Europe" if i % 2 else "Asia",
+                "skills": ["Negotiation"],
+                "deals": [{"client": f"Client{i}", "value": i * 1000, "status": "Closed Won"}],
+                "clients": [{"name": f"Client{i}", "industry": "Tech", "contact": f"c{i}@x.com"}],
+            }
+            for i in range(count)
+        ]
+    }
+
+def test_context_respects_token_budget():
+    snapshot = Snapshot.from_data(many_reps(2000))
+    context = build_context(snapshot, "How is Europe doing?", token_budget=2000)
+    assert estimate_tokens(context) <= 2000
+    assert '"region":"Europe"' in context
+    assert '"region":"Asia"' not in context
+
+def test_context_prefers_reps_named_in_question():
+    snapshot = Snapshot.from_data(many_reps(2000))
+    context = build_context(snapshot, "What deals does Client1234 have?", token_budget=1500)
+    assert '"name":"Rep1234"' in context
+
+def test_context_falls_back_to_top_reps():
+    snapshot = Snapshot.from_data(many_reps(100))
+    context = build_context(snapshot, "Summarize performance", token_budget=1000)
+    assert '"name":"Rep99"' in context
+    assert '"name":"Rep0"' not in context
+
+def test_context_includes_aggregates_and_all_small_data():
+    snapshot = Snapshot.from_data(DUMMY_DATA)
+    context = build_context(snapshot, "Who is the top rep?", token_budget=8000)
+    assert "2 sales representatives" in context
+    assert '"by_region"' in context
+    assert "John Doe" in context and "Jane Smith" in context
+
+def test_context_data_is_cached_per_snapshot():
+    snapshot = Snapshot.from_data(DUMMY_DATA)
+    assert get_context_data(snapshot) is get_context_data(snapshot)
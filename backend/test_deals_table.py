@@ -0,0 +1,47 @@
+import pytest
+from fastapi.testclient import TestClient
+from deals_table import DealsTable
+from main import app
+from test_main import DUMMY_DATA, use_data
+
+client = TestClient(app)
+
+def test_columns():
+    table = DealsTable(DUMMY_DATA["salesReps"])
+    assert len(table) == 4
+    assert table.rep_index.tolist() == [0, 0, 1, 1]
+    assert table.value.tolist() == [50000, 75000, 30000, 45000]
+    assert [table.clients.labels[c] for c in table.client] == ["ABC Corp", "XYZ Inc", "Global Ltd", "Euro Tech"]
+
+def test_summary():
+    summary = DealsTable(DUMMY_DATA["salesReps"]).summary(top=1)
+    assert summary["total_deals"] == 4
+    assert summary["total_value"] == 200000
+    assert summary["average_deal_size"] == 50000
+    assert summary["win_rate"] == pytest.approx(2 / 3)
+
+    by_status = {s["status"]: s for s in summary["by_status"]}
+    assert by_status["Closed Won"]["total_value"] == 95000
+    assert by_status["In Progress"]["deal_count"] == 1
+
+    by_region = {r["region"]: r for r in summary["by_region"]}
+    assert by_region["Europe"]["total_value"] == 75000
+    assert by_region["Europe"]["win_rate"] == 0.5
+    assert by_region["North America"]["win_rate"] == 1.0
+
+    assert [r["name"] for r in summary["top_reps"]] == ["John Doe"]
+    assert summary["top_reps"][0]["total_value"] == 125000
+
+def test_summary_empty():
+    summary = DealsTable([]).summary()
+    assert summary["total_deals"] == 0
+    assert summary["win_rate"] is None
+    assert summary["top_reps"] == []
+
+def test_deal_stats_endpoint():
+    with use_data(DUMMY_DATA):
+        response = client.get("/api/stats/deals?top=2")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_deals"] == 4
+    assert [r["id"] for r in data["top_reps"]] == ["1", "2"]
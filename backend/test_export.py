@@ -0,0 +1,45 @@
+import csv
+import io
+import json
+from fastapi.testclient import TestClient
+from export import EXPORT_CHUNK_SIZE, iter_ndjson
+from main import app
+from test_main import DUMMY_DATA, use_data
+
+client = TestClient(app)
+
+def test_export_ndjson():
+    with use_data(DUMMY_DATA):
+        response = client.get("/api/sales-reps/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    reps = [json.loads(line) for line in response.text.splitlines()]
+    assert reps == DUMMY_DATA["salesReps"]
+
+def test_export_with_filters():
+    with use_data(DUMMY_DATA):
+        response = client.get("/api/sales-reps/export?region=europe")
+    reps = [json.loads(line) for line in response.text.splitlines()]
+    assert [rep["name"] for rep in reps] == ["Jane Smith"]
+
+def test_export_csv():
+    with use_data(DUMMY_DATA):
+        response = client.get("/api/sales-reps/export?format=csv&skills=leader")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["name"] == "John Doe"
+    assert rows[0]["skills"] == "Negotiation;Leadership;Product Knowledge"
+    assert rows[0]["deal_value"] == "125000"
+
+def test_export_invalid_format():
+    with use_data(DUMMY_DATA):
+        response = client.get("/api/sales-reps/export?format=xml")
+    assert response.status_code == 422
+
+def test_export_is_chunked():
+    reps = ({"id": i, "name": "x" * 100} for i in range(5000))
+    chunks = list(iter_ndjson(reps))
+    assert len(chunks) > 1
+    assert all(len(chunk) < EXPORT_CHUNK_SIZE + 200 for chunk in chunks)
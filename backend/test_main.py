@@ -2,7 +2,9 @@ import json
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, mock_open, MagicMock
+import main
 from main import app, load_data, paginate_data, search_data
+from dataset import DatasetStore
 
 # Create test client
 client = TestClient(app)
@@ -43,22 +45,61 @@ DUMMY_DATA = {
     ]
 }
 
+# Inject an in-memory dataset snapshot
+def use_data(data):
+    return patch('main.dataset_store', DatasetStore.from_data(data))
+
+# Start every test with an empty AI answer cache
+@pytest.fixture(autouse=True)
+def clear_ai_cache():
+    main.ai_cache.clear()
+    yield
+
 # Mock data loading
 @pytest.fixture
 def mock_load_data():
-    with patch('main.load_data', return_value=DUMMY_DATA):
+    with use_data(DUMMY_DATA):
         yield DUMMY_DATA
 
-# Test load_data function with mocked file
-def test_load_data():
-    # Mock open to return our dummy data
-    mock_file_data = json.dumps(DUMMY_DATA)
-    with patch("builtins.open", mock_open(read_data=mock_file_data)):
+# Test load_data function with a dataset file
+def test_load_data(tmp_path):
+    data_file = tmp_path / "data.json"
+    data_file.write_text(json.dumps(DUMMY_DATA))
+    with patch('main.dataset_store', DatasetStore(data_file)):
         data = load_data()
         assert data == DUMMY_DATA
         assert "salesReps" in data
         assert len(data["salesReps"]) == 2
 
+# Test that the dataset is parsed once and reloaded when the file changes
+def test_dataset_store_reload(tmp_path):
+    data_file = tmp_path / "data.json"
+    data_file.write_text(json.dumps(DUMMY_DATA))
+    store = DatasetStore(data_file, check_interval=0)
+
+    first = store.get()
+    with patch("builtins.open", side_effect=AssertionError("file re-read")):
+        assert store.get() is first
+    assert store.reload_count == 1
+
+    changed = {"salesReps": DUMMY_DATA["salesReps"][:1]}
+    data_file.write_text(json.dumps(changed))
+    second = store.get()
+    assert second is not first
+    assert second.version > first.version
+    assert second.data == changed
+    assert store.reload_count == 2
+    # Readers holding the old snapshot still see the complete old data
+    assert len(first.sales_reps) == 2
+
+# Test the dataset info endpoint
+def test_dataset_info(mock_load_data):
+    response = client.get("/api/dataset")
+    assert response.status_code == 200
+    info = response.json()
+    assert info["total_reps"] == 2
+    assert info["version"] is not None
+
 # Test search_data function
 def test_search_data():
     # Test with name search
@@ -217,6 +258,7 @@ def test_ai_endpoint(mock_generative_model, mock_load_data):
     mock_chat.send_message.reset_mock()
     mock_model.start_chat.reset_mock()
     mock_generative_model.reset_mock()
+    main.ai_cache.clear()
     
     request_data = {
         "question": "Who is the top sales rep?",
@@ -231,25 +273,25 @@ def test_ai_endpoint(mock_generative_model, mock_load_data):
     mock_chat.send_message.assert_called_once()
 
 # Test error handling for load_data
-@patch("builtins.open", side_effect=Exception("File not found"))
-def test_load_data_error(mock_open):
-    with pytest.raises(Exception):
-        load_data()
+def test_load_data_error(tmp_path):
+    with patch('main.dataset_store', DatasetStore(tmp_path / "missing.json")):
+        with pytest.raises(Exception):
+            load_data()
 
 # Test error handling for GET /api/sales-reps
-@patch('main.load_data', side_effect=Exception("Database error"))
-def test_get_sales_reps_error(mock_load_data):
+@patch('main.get_snapshot', side_effect=Exception("Database error"))
+def test_get_sales_reps_error(mock_get_snapshot):
     response = client.get("/api/sales-reps")
     assert response.status_code == 500
     assert "detail" in response.json()
 
 # Test error handling for POST /api/ai
-@patch('main.load_data', return_value={"salesReps": []})
-def test_ai_endpoint_empty_data(mock_load_data):
+def test_ai_endpoint_empty_data():
     request_data = {
         "question": "Who is the top sales rep?"
     }
-    response = client.post("/api/ai", json=request_data)
+    with use_data({"salesReps": []}):
+        response = client.post("/api/ai", json=request_data)
     assert response.status_code == 200
     data = response.json()
     assert "answer" in data
@@ -257,8 +299,7 @@ def test_ai_endpoint_empty_data(mock_load_data):
 
 # Test AI endpoint with invalid model - FIXED TEST
 @patch('google.generativeai.GenerativeModel', side_effect=Exception("Model not available"))
-@patch('main.load_data', return_value=DUMMY_DATA)
-def test_ai_endpoint_model_error(mock_load_data, mock_generative_model):
+def test_ai_endpoint_model_error(mock_generative_model, mock_load_data):
     request_data = {
         "question": "Who is the top sales rep?"
     }
@@ -269,4 +310,45 @@ def test_ai_endpoint_model_error(mock_load_data, mock_generative_model):
     data = response.json()
     assert "answer" in data
     # Verify the response indicates service unavailability
-    assert "AI service is currently unavailable" in data["answer"]
\ No newline at end of file
+    assert "AI service is currently unavailable" in data["answer"]
+# Test GET /api/sales-reps with cursor pagination
+def test_get_sales_reps_with_cursor(mock_load_data):
+    response = client.get("/api/sales-reps?limit=1")
+    assert response.status_code == 200
+    data = response.json()
+    assert [rep["id"] for rep in data["data"]] == ["1"]
+    assert data["meta"]["has_next"] == True
+    assert "total_items" not in data["meta"]
+    
+    response = client.get(f"/api/sales-reps?limit=1&cursor={data['meta']['next_cursor']}&include_total=true")
+    assert response.status_code == 200
+    data = response.json()
+    assert [rep["id"] for rep in data["data"]] == ["2"]
+    assert data["meta"]["has_next"] == False
+    assert data["meta"]["next_cursor"] is None
+    assert data["meta"]["total_items"] == 2
+    
+    # Filters apply in cursor mode too
+    response = client.get("/api/sales-reps?limit=5&region=europe&include_total=true")
+    data = response.json()
+    assert [rep["name"] for rep in data["data"]] == ["Jane Smith"]
+    assert data["meta"]["total_items"] == 1
+
+# Test that cursor pages walk the whole dataset in id order
+def test_cursor_pagination_walks_all_reps():
+    reps = [{"id": i, "name": f"Rep {i}", "region": "Europe" if i % 2 else "Asia"} for i in (5, 3, 9, 1, 7, 2)]
+    with use_data({"salesReps": reps}):
+        seen, cursor = [], None
+        while True:
+            url = "/api/sales-reps?limit=2&region=europe" + (f"&cursor={cursor}" if cursor else "")
+            meta = client.get(url).json()
+            seen += [rep["id"] for rep in meta["data"]]
+            cursor = meta["meta"]["next_cursor"]
+            if not cursor:
+                break
+    assert seen == [1, 3, 5, 7, 9]
+
+# Test invalid cursor
+def test_get_sales_reps_invalid_cursor(mock_load_data):
+    response = client.get("/api/sales-reps?cursor=not-a-cursor")
+    assert response.status_code == 400
@@ -0,0 +1,68 @@
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from response_cache import ResponseCache, etag_matches
+from main import app
+from test_main import DUMMY_DATA, use_data
+
+client = TestClient(app)
+
+def test_lru_eviction_by_size():
+    cache = ResponseCache(max_bytes=10)
+    cache.put("a", b"12345", '"a"')
+    cache.put("b", b"12345", '"b"')
+    assert cache.get("a") is not None  # "a" becomes most recently used
+    cache.put("c", b"12345", '"c"')
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.evictions == 1
+    assert cache.size_bytes == 10
+
+def test_ttl_expiry():
+    cache = ResponseCache(ttl=10)
+    with patch("response_cache.time.monotonic", return_value=100.0):
+        cache.put("a", b"x", '"a"')
+    with patch("response_cache.time.monotonic", return_value=105.0):
+        assert cache.get("a") is not None
+    with patch("response_cache.time.monotonic", return_value=111.0):
+        assert cache.get("a") is None
+    assert cache.size_bytes == 0
+
+def test_etag_matches():
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches('W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+def test_sales_reps_cached_with_etag():
+    with use_data(DUMMY_DATA), patch("main.response_cache", ResponseCache()) as cache:
+        first = client.get("/api/sales-reps?name=John")
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+
+        # Normalized filters share the cache entry and the ETag
+        second = client.get("/api/sales-reps?name=%20john%20")
+        assert second.json() == first.json()
+        assert second.headers["etag"] == etag
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+        not_modified = client.get("/api/sales-reps?name=john", headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+
+        other = client.get("/api/sales-reps?name=jane")
+        assert other.headers["etag"] != etag
+
+def test_cache_invalidated_by_new_snapshot():
+    with patch("main.response_cache", ResponseCache()):
+        with use_data(DUMMY_DATA):
+            assert client.get("/api/sales-reps").json()["meta"]["total_items"] == 2
+        with use_data({"salesReps": DUMMY_DATA["salesReps"][:1]}):
+            assert client.get("/api/sales-reps").json()["meta"]["total_items"] == 1
+
+def test_cache_stats_endpoint():
+    response = client.get("/api/cache/stats")
+    assert response.status_code == 200
+    assert {"hits", "misses", "evictions"} <= set(response.json()["responses"])
@@ -0,0 +1,65 @@
+import random
+import pytest
+from search_index import SearchIndex
+from main import search_data
+from test_main import DUMMY_DATA
+
+# Reference implementation: the original linear-scan filter
+def linear_match(reps, name=None, role=None, region=None, skills=None):
+    rows = []
+    for row, rep in enumerate(reps):
+        if name and name.lower() not in rep.get("name", "").lower():
+            continue
+        if role and role.lower() not in rep.get("role", "").lower():
+            continue
+        if region and region.lower() not in rep.get("region", "").lower():
+            continue
+        if skills and not any(skills.lower() in s.lower() for s in rep.get("skills", [])):
+            continue
+        rows.append(row)
+    return rows
+
+def random_reps(count, seed=7):
+    rng = random.Random(seed)
+    names = ["Alice", "Bob", "Charlie", "Dana", "Eve", "Frank", "Grace"]
+    roles = ["Sales Manager", "Account Executive", "Sales Representative"]
+    regions = ["North America", "Europe", "Asia-Pacific", "South America"]
+    skills = ["Negotiation", "CRM", "Leadership", "Prospecting", "B2B Sales", "Client Relations"]
+    return [
+        {
+            "id": i,
+            "name": f"{rng.choice(names)} {rng.choice(names)}son",
+            "role": rng.choice(roles),
+            "region": rng.choice(regions),
+            "skills": rng.sample(skills, rng.randint(0, 3)),
+        }
+        for i in range(count)
+    ]
+
+@pytest.mark.parametrize("filters", [
+    {"name": "alice"},
+    {"name": "al"},
+    {"name": "E"},
+    {"role": "sales"},
+    {"region": "america"},
+    {"skills": "crm"},
+    {"skills": "sales"},
+    {"name": "son", "region": "europe", "skills": "neg"},
+    {"role": "manager", "region": "asia"},
+    {"name": "zzz"},
+    {"region": "a"},
+])
+def test_index_matches_linear_scan(filters):
+    reps = random_reps(500)
+    index = SearchIndex(reps)
+    assert index.match(**filters) == linear_match(reps, **filters)
+
+def test_index_without_filters_returns_all_rows():
+    reps = random_reps(10)
+    assert SearchIndex(reps).match() == list(range(10))
+
+def test_search_data_with_index():
+    reps = DUMMY_DATA["salesReps"]
+    index = SearchIndex(reps)
+    for query in ["john", "manager", "europe", "leadership", "e", "nonexistent"]:
+        assert search_data(reps, query, index) == search_data(reps, query)